@@ -1,28 +1,26 @@
 import itertools
 import copy
+import os
 from process import Process
-from scheduler import (NpFcfsScheduler, NpSjfScheduler, NpEdfScheduler, NpLlfScheduler, PSjfScheduler, PEdfScheduler,
-                       PRrScheduler)
-from globals import SCHEDULERS, BSS_EXAMPLES
+from scheduler import STRATEGIES, NP_FCFS, NP_SJF, NP_EDF, NP_LLF, P_SJF, P_EDF, P_RR, create_scheduler
+from globals import BSS_EXAMPLES
+from sweep import run_sweep
 
 
 def exercise_1(quantum, print_logger):
     # helper function to run the scheduling simulation
-    def run_simulation(scheduler_type, scheduler_name, n_cpus, process_configs):
+    def run_simulation(scheduler_name, n_cpus, process_configs):
         # init scheduler
-        if scheduler_type == PRrScheduler:
-            scheduler = PRrScheduler([Process(idx + 1, ready_time, exec_time, deadline)
-                                      for idx, (ready_time, exec_time, deadline)
-                                      in enumerate(process_configs)], quantum)
-        else:
-            scheduler = scheduler_type(n_cpus, [Process(idx + 1, ready_time, exec_time, deadline)
-                                                for idx, (ready_time, exec_time, deadline)
-                                                in enumerate(process_configs)])
+        scheduler = create_scheduler(scheduler_name, n_cpus, [Process(idx + 1, ready_time, exec_time, deadline)
+                                                              for idx, (ready_time, exec_time, deadline)
+                                                              in enumerate(process_configs)], quantum)
 
         # run simulation until its finished
         scheduler.run_until_finished()
 
         # print the result
+        if scheduler.uses_quantum:
+            scheduler_name = f'{scheduler_name}, Quantum: {quantum},'
         print(f'Scheduler: {scheduler_name} with {n_cpus} {"CPU" if n_cpus == 1 else "CPUs"}')
         print(f'Process configurations: {process_configs}')
         if print_logger:
@@ -31,14 +29,14 @@ def exercise_1(quantum, print_logger):
             print(f'Average delta time was {scheduler.avg_delta_time}\n')
 
     # examples are executed in the same order as they occur in the bss script
-    run_simulation(NpFcfsScheduler, SCHEDULERS[0], 1, BSS_EXAMPLES[0:5])
-    run_simulation(NpSjfScheduler, SCHEDULERS[1], 1, BSS_EXAMPLES[0:5])
-    run_simulation(NpEdfScheduler, SCHEDULERS[2], 2, BSS_EXAMPLES[10:13])
-    run_simulation(NpLlfScheduler, SCHEDULERS[3], 2, BSS_EXAMPLES[10:13])
-    run_simulation(PRrScheduler, f'{SCHEDULERS[7]}, Quantum: {quantum},', 1, BSS_EXAMPLES[0:5])
-    run_simulation(PSjfScheduler, SCHEDULERS[4], 1, BSS_EXAMPLES[5:10])
-    run_simulation(NpSjfScheduler, SCHEDULERS[1], 1, BSS_EXAMPLES[5:10])
-    run_simulation(PEdfScheduler, SCHEDULERS[5], 1, BSS_EXAMPLES[13:17])
+    run_simulation(NP_FCFS, 1, BSS_EXAMPLES[0:5])
+    run_simulation(NP_SJF, 1, BSS_EXAMPLES[0:5])
+    run_simulation(NP_EDF, 2, BSS_EXAMPLES[10:13])
+    run_simulation(NP_LLF, 2, BSS_EXAMPLES[10:13])
+    run_simulation(P_RR, 1, BSS_EXAMPLES[0:5])
+    run_simulation(P_SJF, 1, BSS_EXAMPLES[5:10])
+    run_simulation(NP_SJF, 1, BSS_EXAMPLES[5:10])
+    run_simulation(P_EDF, 1, BSS_EXAMPLES[13:17])
 
 
 # a simple helper function to print the results of exercise 2 and 3
@@ -55,8 +53,25 @@ def print_permutations(scheduler_name, perm_to_time, sort_by_avg_delta_time):
     print()
 
 
+# helper function to run the simulations of exercise 2 and 3 as resumable sweep in the work-queue directory
+# "queue_dir", jobs are given as tuple of (scheduler_name, n_cpus, quantum, process_configs)
+def sweep_permutations(queue_dir, jobs, n_workers):
+    return {tuple([tuple(process_config) for process_config in process_configs]): avg_delta_time
+            for (_, _, _, process_configs), avg_delta_time in run_sweep(queue_dir, jobs, n_workers)}
+
+
 # in exercise 2 and 3 the results are stored in a dict "perm_to_time" to allow them to be sorted by average delta time
-def exercise_2(quantum, sort_by_avg_delta_time):
+def exercise_2(quantum, sort_by_avg_delta_time, queue_dir=None, n_workers=1):
+    scheduler_name = P_RR
+
+    if queue_dir is not None:
+        perm_to_time = sweep_permutations(os.path.join(queue_dir, f'exercise_2_quantum_{quantum}'),
+                                          [(scheduler_name, 1, quantum, permutation)
+                                           for permutation in itertools.permutations(BSS_EXAMPLES[0:5])],
+                                          n_workers)
+        print_permutations(f'{scheduler_name}, Quantum: {quantum}', perm_to_time, sort_by_avg_delta_time)
+        return
+
     perm_to_time = {}
 
     # permute the order of the processes
@@ -64,7 +79,7 @@ def exercise_2(quantum, sort_by_avg_delta_time):
                                                for idx, (ready_time, exec_time, deadline)
                                                in enumerate(BSS_EXAMPLES[0:5])]):
         # init scheduler
-        scheduler = PRrScheduler(copy.deepcopy(permutation), quantum)
+        scheduler = create_scheduler(scheduler_name, 1, copy.deepcopy(permutation), quantum)
 
         # run simulation until its finished
         scheduler.run_until_finished()
@@ -74,19 +89,33 @@ def exercise_2(quantum, sort_by_avg_delta_time):
                             for process
                             in permutation])] = scheduler.avg_delta_time
 
-    print_permutations(f'{SCHEDULERS[7]}, Quantum: {quantum}', perm_to_time, sort_by_avg_delta_time)
-
+    print_permutations(f'{scheduler_name}, Quantum: {quantum}', perm_to_time, sort_by_avg_delta_time)
+
+
+def exercise_3(sort_by_avg_delta_time, queue_dir=None, n_workers=1):
+    def permute(scheduler_name):
+        if queue_dir is not None:
+            sweep_dir = os.path.join(queue_dir, f'exercise_3_{STRATEGIES[scheduler_name].__name__}')
+            perm_to_time = sweep_permutations(sweep_dir,
+                                              [(scheduler_name, 1, None,
+                                                [(ready_time, exec_time, deadline)
+                                                 for ready_time, (_, exec_time, deadline)
+                                                 in zip(permutation, BSS_EXAMPLES[5:10])])
+                                               for permutation
+                                               in itertools.permutations([process_config[0]
+                                                                          for process_config in BSS_EXAMPLES[5:10]])],
+                                              n_workers)
+            print_permutations(scheduler_name, perm_to_time, sort_by_avg_delta_time)
+            return
 
-def exercise_3(sort_by_avg_delta_time):
-    def permute(scheduler_type, scheduler_name):
         perm_to_time = {}
 
         # permute the ready times of the processes
         for permutation in itertools.permutations([process_config[0] for process_config in BSS_EXAMPLES[5:10]]):
             # init scheduler
-            scheduler = scheduler_type(1, [Process(idx + 1, ready_time, exec_time, deadline)
-                                           for idx, (ready_time, (_, exec_time, deadline))
-                                           in enumerate(zip(permutation, BSS_EXAMPLES[5:10]))])
+            scheduler = create_scheduler(scheduler_name, 1, [Process(idx + 1, ready_time, exec_time, deadline)
+                                                             for idx, (ready_time, (_, exec_time, deadline))
+                                                             in enumerate(zip(permutation, BSS_EXAMPLES[5:10]))])
 
             # run simulation until its finished
             scheduler.run_until_finished()
@@ -97,5 +126,5 @@ def exercise_3(sort_by_avg_delta_time):
         # store results in dict
         print_permutations(scheduler_name, perm_to_time, sort_by_avg_delta_time)
 
-    permute(NpSjfScheduler, SCHEDULERS[1])
-    permute(PSjfScheduler, SCHEDULERS[4])
+    permute(NP_SJF)
+    permute(P_SJF)
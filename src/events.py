@@ -0,0 +1,165 @@
+import asyncio
+import collections
+import json
+
+
+# event-stream-specific constants
+QUEUE_SIZE = 1024
+BLOCK_TIMEOUT = 1
+
+# policies of a subscription if its queue is full
+# POLICY_BLOCK: the simulation waits until the subscriber consumed enough events (backpressure), but at most
+# "block_timeout" seconds per clock-cycle, after that the events are coalesced like with POLICY_COALESCE
+# POLICY_DROP: the oldest queued events are dropped, the simulation never waits for the subscriber
+# POLICY_COALESCE: all queued events and the remaining events of the current clock-cycle are replaced by one
+# EVENT_SNAPSHOT with the cpu allocation at the end of the clock-cycle
+POLICY_BLOCK = 'block'
+POLICY_DROP = 'drop'
+POLICY_COALESCE = 'coalesce'
+
+# event that replaces coalesced events, tuple of (timestamp, EVENT_SNAPSHOT, None, allocation) with "allocation"
+# being the scheduler's last_allocation
+EVENT_SNAPSHOT = 'snapshot'
+
+
+# async iterator over the events of one subscriber, holding at most "maxsize" events
+class Subscription:
+    def __init__(self, publisher, maxsize, policy, block_timeout):
+        self._publisher = publisher
+        self._maxsize = maxsize
+        self._policy = policy
+        self._block_timeout = block_timeout
+        self._events = collections.deque()
+        self._closed = False
+        self._dropped = 0
+
+        # set whenever events got added (awaited by the subscriber) or removed (awaited by the publisher)
+        # every event is only cleared by the side that waits for it, so no wakeup gets lost
+        self._events_added = asyncio.Event()
+        self._events_removed = asyncio.Event()
+
+    # number of events that got lost because of POLICY_DROP or POLICY_COALESCE
+    @property
+    def dropped(self):
+        return self._dropped
+
+    def close(self):
+        self._publisher.unsubscribe(self)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while not self._events:
+            if self._closed:
+                raise StopAsyncIteration
+            self._events_added.clear()
+            await self._events_added.wait()
+
+        self._events_removed.set()
+        return self._events.popleft()
+
+    # queues the events of one clock-cycle, "snapshot" is the EVENT_SNAPSHOT used for coalescing
+    async def _put(self, events, snapshot):
+        deadline = asyncio.get_running_loop().time() + self._block_timeout
+        for idx, event in enumerate(events):
+            if len(self._events) >= self._maxsize:
+                if self._policy == POLICY_DROP:
+                    self._events.popleft()
+                    self._dropped += 1
+                elif self._policy != POLICY_BLOCK or not await self._wait_for_space(deadline):
+                    # the snapshot already contains the effects of the remaining events of this clock-cycle
+                    self._dropped += len([None for queued_event in self._events
+                                          if queued_event[1] != EVENT_SNAPSHOT]) + len(events) - idx
+                    self._events.clear()
+                    self._events.append(snapshot)
+                    self._events_added.set()
+                    return
+
+            if self._closed:
+                return
+            self._events.append(event)
+            self._events_added.set()
+
+    # waits until the queue has space again, returns False if that did not happen until "deadline"
+    async def _wait_for_space(self, deadline):
+        while len(self._events) >= self._maxsize and not self._closed:
+            self._events_removed.clear()
+            try:
+                await asyncio.wait_for(self._events_removed.wait(), deadline - asyncio.get_running_loop().time())
+            except asyncio.TimeoutError:
+                return False
+        return True
+
+    def _finish(self):
+        self._closed = True
+        self._events_added.set()
+        self._events_removed.set()
+
+
+# turns the events of a scheduler into async iterators for any number of subscribers
+class EventPublisher:
+    def __init__(self, scheduler):
+        self._scheduler = scheduler
+        self._subscriptions = []
+        self._pending_events = []
+        self._finished = False
+
+    # subscriptions created after the simulation finished are finished as well and do not yield any events
+    def subscribe(self, maxsize=QUEUE_SIZE, policy=POLICY_BLOCK, block_timeout=BLOCK_TIMEOUT):
+        subscription = Subscription(self, maxsize, policy, block_timeout)
+        if self._finished:
+            subscription._finish()
+        else:
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+        subscription._finish()
+
+    # runs the simulation until all processes are finished and publishes the events after every clock-cycle
+    # "interval" is the time in seconds between two clock-cycles
+    async def run(self, interval=0):
+        # the listener is only attached while the simulation runs here, so stepping the scheduler elsewhere does not
+        # queue up events
+        self._scheduler.add_listener(self._pending_events.append)
+        try:
+            running = True
+            while running:
+                running = self._scheduler.step()
+                await self._publish()
+                await asyncio.sleep(interval)
+        finally:
+            self._finished = True
+            for subscription in list(self._subscriptions):
+                self.unsubscribe(subscription)
+
+            self._scheduler.remove_listener(self._pending_events.append)
+
+    async def _publish(self):
+        events = list(self._pending_events)
+        self._pending_events.clear()
+
+        snapshot = (self._scheduler.timeline.end_time - 1, EVENT_SNAPSHOT, None, self._scheduler.last_allocation)
+        for subscription in list(self._subscriptions):
+            await subscription._put(events, snapshot)
+
+
+# serves the events of "publisher" as json lines to every client that connects to host:port
+# slow clients do not stall the simulation, their events are coalesced instead
+async def serve_tcp(publisher, host='localhost', port=8765, maxsize=QUEUE_SIZE, policy=POLICY_COALESCE):
+    async def handle_client(reader, writer):
+        subscription = publisher.subscribe(maxsize, policy)
+        try:
+            async for event in subscription:
+                writer.write((json.dumps(event) + '\n').encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            subscription.close()
+            writer.close()
+
+    return await asyncio.start_server(handle_client, host, port)
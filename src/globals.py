@@ -1,14 +1,3 @@
-SCHEDULERS = [
-    'First Come First Serve (nonpreemptive)',
-    'Shortest Job First (nonpreemptive)',
-    'Earliest Deadline First (nonpreemptive)',
-    'Least Laxity First (nonpreemptive)',
-    'Shortest Job First (preemptive)',
-    'Earliest Deadline First (preemptive)',
-    'Least Laxity First (preemptive)',
-    'Round Robin (preemptive)'
-]
-
 BSS_EXAMPLES = [
     # example for FCFS, SJF, RR
     (0, 22, 0),
@@ -18,6 +18,10 @@ if __name__ == '__main__':
     parser.add_argument('-q', '--quantum', help='set quantum of the "Round Robin"-schedulers from exercise 1 and 2')
     parser.add_argument('-s', '--sorted', action='store_true', help='print result of exercise 2 and 3 sorted by the '
                                                                     'average delta time')
+    parser.add_argument('-w', '--work_queue', help='run exercise 2 and 3 as resumable sweep in the given work-queue '
+                                                   'directory (can be shared by several nodes)')
+    parser.add_argument('-j', '--workers', type=int, default=1, help='number of local worker processes used with '
+                                                                      '-w/--work_queue')
     parser.add_argument('-b', '--bss_examples', action='store_true', help='set some default values in the simulator')
     args = parser.parse_args()
 
@@ -29,14 +33,17 @@ if __name__ == '__main__':
         if not 0 < quantum:
             parser.error('quantum must be minimum 1')
 
+    if not 0 < args.workers:
+        parser.error('number of workers must be minimum 1')
+
     if args.exercise_1:
         exercise_1(quantum, args.logger)
 
     if args.exercise_2:
-        exercise_2(quantum, args.sorted)
+        exercise_2(quantum, args.sorted, args.work_queue, args.workers)
 
     if args.exercise_3:
-        exercise_3(args.sorted)
+        exercise_3(args.sorted, args.work_queue, args.workers)
 
     if not args.exercise_1 and not args.exercise_2 and not args.exercise_3:
         app = QApplication([])
@@ -1,16 +1,16 @@
+import math
 import os
 import numpy as np
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg, NavigationToolbar2QT
+from matplotlib.colors import to_rgba
 from matplotlib.figure import Figure
-from matplotlib.patches import Rectangle
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QIcon
 from PyQt5.QtWidgets import (QMainWindow, QLayout, QGridLayout, QFormLayout, QVBoxLayout, QWidget, QSpinBox, QLabel,
                              QComboBox, QPushButton, QCheckBox, QTextEdit)
 from process import Process
-from scheduler import (NpFcfsScheduler, NpSjfScheduler, NpEdfScheduler, NpLlfScheduler, PSjfScheduler, PEdfScheduler,
-                       PLlfScheduler, PRrScheduler)
-from globals import SCHEDULERS, BSS_EXAMPLES
+from scheduler import STRATEGIES, create_scheduler
+from globals import BSS_EXAMPLES
 
 
 # gui-specific constants
@@ -18,6 +18,7 @@ MAX_CPUS = 4
 MAX_SIM_TIME = 100
 MAX_QUANTUM = 10
 LINE_WIDTH = 0.2
+REDRAW_DELAY = 50
 PROCESS_COLORS = [
     'red', 'blue', 'green', 'yellow', 'magenta', 'grey', 'cyan', 'chocolate', 'blueviolet', 'brown', 'darkred',
     'salmon', 'gold', 'khaki', 'hotpink', 'limegreen', 'lightblue', 'navy', 'olive', 'orange'
@@ -28,6 +29,14 @@ class MainWindow(QMainWindow):
     def __init__(self, set_bss_examples=False):
         super().__init__()
         self._ui = {}
+
+        # redraws after panning or zooming are delayed by REDRAW_DELAY milliseconds, so the many xlim changes of one
+        # pan or zoom only lead to one redraw
+        self._redraw_timer = QTimer(self)
+        self._redraw_timer.setSingleShot(True)
+        self._redraw_timer.setInterval(REDRAW_DELAY)
+        self._redraw_timer.timeout.connect(self._update_graph)
+
         self._init_mpl()
         self._init_qt(set_bss_examples)
 
@@ -36,7 +45,7 @@ class MainWindow(QMainWindow):
 
     # called when the users selects another strategy in the combobox
     def _strategy_changed(self, idx):
-        if idx == 7:
+        if STRATEGIES[self._ui['strategy_selection'].itemText(idx)].uses_quantum:
             self._ui['quantum_selection'].setEnabled(True)
             self._ui['quantum_selection'].setSpecialValueText('')
             self._ui['n_cpus_selection'].setValue(1)
@@ -57,23 +66,8 @@ class MainWindow(QMainWindow):
                      if checkbox.isChecked()]
 
         if processes:
-            match self._ui['strategy_selection'].currentIndex():
-                case 0:
-                    self._scheduler = NpFcfsScheduler(n_cpus, processes)
-                case 1:
-                    self._scheduler = NpSjfScheduler(n_cpus, processes)
-                case 2:
-                    self._scheduler = NpEdfScheduler(n_cpus, processes)
-                case 3:
-                    self._scheduler = NpLlfScheduler(n_cpus, processes)
-                case 4:
-                    self._scheduler = PSjfScheduler(n_cpus, processes)
-                case 5:
-                    self._scheduler = PEdfScheduler(n_cpus, processes)
-                case 6:
-                    self._scheduler = PLlfScheduler(n_cpus, processes)
-                case 7:
-                    self._scheduler = PRrScheduler(processes, self._ui['quantum_selection'].value())
+            self._scheduler = create_scheduler(self._ui['strategy_selection'].currentText(), n_cpus, processes,
+                                               self._ui['quantum_selection'].value())
 
             self._ui['init_sim_button'].setEnabled(False)
             self._ui['next_step_button'].setEnabled(True)
@@ -90,8 +84,9 @@ class MainWindow(QMainWindow):
 
     def _run_sim_button_clicked(self):
         while self._scheduler.step():
-            self._update_graph()
+            pass
 
+        self._update_graph()
         self._update_logger()
 
         self._ui['next_step_button'].setEnabled(False)
@@ -114,20 +109,76 @@ class MainWindow(QMainWindow):
         else:
             self._ui['logger'].setText('')
 
+    # redraws the visible part of the timeline with a level of detail based on the visible time range
+    # if a cpu has more intervals in the visible range than the graph has pixels, the range is split into one bin per
+    # pixel, colored by the process that ran longest in the bin and shaded by the utilization of the bin
+    # otherwise all intervals are drawn in full resolution
     def _update_graph(self):
-        if self._scheduler is not None:
-            for timestamp, cid, pid in self._scheduler.last_allocation:
-                self._graph_data.append(
-                    self._ui['graph_axes'].add_patch(Rectangle((timestamp, cid - LINE_WIDTH / 2), 1, LINE_WIDTH,
-                                                               facecolor=PROCESS_COLORS[pid - 1])))
-        else:
-            for item in self._graph_data:
-                item.remove()
+        for item in self._graph_data:
+            item.remove()
 
-            self._graph_data = []
+        self._graph_data = []
+
+        if self._scheduler is not None:
+            timeline = self._scheduler.timeline
+            x_min, x_max = self._ui['graph_axes'].get_xlim()
+            t0, t1 = max(0, math.floor(x_min)), min(timeline.end_time, math.ceil(x_max))
+            n_bins = max(1, int(self._ui['graph_axes'].get_window_extent().width))
+
+            for cid in timeline.cpu_ids:
+                if t1 <= t0:
+                    break
+
+                if timeline.count_between(cid, t0, t1) <= n_bins:
+                    bars = [(start, end - start, to_rgba(PROCESS_COLORS[pid - 1]))
+                            for _, pid, start, end in timeline.intervals_between(cid, t0, t1)]
+                else:
+                    bars = self._downsample(timeline, cid, t0, t1, n_bins)
+
+                if bars:
+                    self._graph_data.append(
+                        self._ui['graph_axes'].broken_barh([(start, width) for start, width, _ in bars],
+                                                           (cid - LINE_WIDTH / 2, LINE_WIDTH),
+                                                           facecolors=[color for _, _, color in bars]))
 
         self._ui['graph_canvas'].draw_idle()
 
+    # aggregates the intervals of the cpu with id "cid" in [t0, t1) into "n_bins" bins and returns them as list of
+    # (start, width, color), adjacent bins with the same color are merged
+    @staticmethod
+    def _downsample(timeline, cid, t0, t1, n_bins):
+        bin_width = (t1 - t0) / n_bins
+        bars = []
+        pids = timeline.pids_on(cid)
+        for idx in range(n_bins):
+            bin_start = t0 + idx * bin_width
+            bin_end = bin_start + bin_width
+
+            busy_time = timeline.busy_time(cid, bin_start, bin_end)
+            if busy_time == 0:
+                continue
+
+            # candidates for the dominant process are the processes of the intervals in the bin, but at most all
+            # processes of the cpu, so the cost of a bin does not depend on the number of intervals
+            if timeline.count_between(cid, bin_start, bin_end) <= len(pids):
+                candidates = {pid for _, pid, _, _ in timeline.intervals_between(cid, bin_start, bin_end)}
+            else:
+                candidates = pids
+            dominant_pid = max(candidates, key=lambda pid: timeline.busy_time(cid, bin_start, bin_end, pid))
+
+            color = to_rgba(PROCESS_COLORS[dominant_pid - 1], busy_time / bin_width)
+
+            if bars and bars[-1][2] == color and math.isclose(bars[-1][0] + bars[-1][1], bin_start):
+                bars[-1] = (bars[-1][0], bars[-1][1] + bin_width, color)
+            else:
+                bars.append((bin_start, bin_width, color))
+        return bars
+
+    # called when the visible time range changed by panning or zooming
+    def _graph_xlim_changed(self, _):
+        if self._scheduler is not None:
+            self._redraw_timer.start()
+
     # init the matplotlib-graph
     def _init_mpl(self):
         fig = Figure(facecolor='lightgray')
@@ -150,6 +201,8 @@ class MainWindow(QMainWindow):
         self._ui['graph_axes'].grid(axis='x', which='major', alpha=0.7)
         self._ui['graph_axes'].grid(axis='x', which='minor', alpha=0.35)
 
+        self._ui['graph_axes'].callbacks.connect('xlim_changed', self._graph_xlim_changed)
+
     # init the qt-ui
     def _init_qt(self, set_bss_examples):
         def create_spinbox(min_value, max_value):
@@ -197,7 +250,8 @@ class MainWindow(QMainWindow):
 
         # graph
         self._ui['graph_canvas'].setMinimumSize(800, 500)
-        create_sub_layout(0, 0, columnspan=3, sub_items=[self._ui['graph_canvas']])
+        self._ui['graph_toolbar'] = NavigationToolbar2QT(self._ui['graph_canvas'], self)
+        create_sub_layout(0, 0, columnspan=3, sub_items=[self._ui['graph_toolbar'], self._ui['graph_canvas']])
 
         # logger
         self._ui['logger'] = QTextEdit('')
@@ -237,7 +291,7 @@ class MainWindow(QMainWindow):
         # scheduler config
         config_layout = QFormLayout()
         self._ui['strategy_selection'] = QComboBox()
-        self._ui['strategy_selection'].addItems(SCHEDULERS)
+        self._ui['strategy_selection'].addItems(list(STRATEGIES))
         self._ui['strategy_selection'].currentIndexChanged.connect(self._strategy_changed)
         self._ui['strategy_selection'].setStyleSheet('background-color : white; selection-color : black;')
         config_layout.addRow(QLabel('Scheduler-Strategy'), self._ui['strategy_selection'])
@@ -1,18 +1,75 @@
 from abc import ABC, abstractmethod
+import numpy as np
 from cpu import CPU
+from timeline import Timeline
+
+
+# scheduler events
+EVENT_ARRIVE = 'arrive'
+EVENT_ALLOCATE = 'allocate'
+EVENT_PREEMPT = 'preempt'
+EVENT_FINISH = 'finish'
+
+# names of the scheduler-strategies as they are registered and shown in the gui
+NP_FCFS = 'First Come First Serve (nonpreemptive)'
+NP_SJF = 'Shortest Job First (nonpreemptive)'
+NP_EDF = 'Earliest Deadline First (nonpreemptive)'
+NP_LLF = 'Least Laxity First (nonpreemptive)'
+P_SJF = 'Shortest Job First (preemptive)'
+P_EDF = 'Earliest Deadline First (preemptive)'
+P_LLF = 'Least Laxity First (preemptive)'
+P_RR = 'Round Robin (preemptive)'
+
+
+# registry of all scheduler-strategies as dict of name -> scheduler class in the order they got registered
+# the gui, the commandline exercises and the sweeps resolve strategies from here
+STRATEGIES = {}
+
+
+# class decorator that registers a scheduler-strategy under the given name
+def register_strategy(name):
+    def register(scheduler_type):
+        scheduler_type.name = name
+        STRATEGIES[name] = scheduler_type
+        return scheduler_type
+    return register
+
+
+# creates a scheduler of the strategy registered under the given name
+def create_scheduler(name, n_cpus, processes, quantum=None):
+    return STRATEGIES[name].create(n_cpus, processes, quantum)
 
 
 # base class for all schedulers
 class Scheduler(ABC):
+    # name under which the strategy is registered (set by "register_strategy")
+    name = None
+
+    # whether the strategy uses a quantum and therefore only works with one cpu
+    uses_quantum = False
+
     def __init__(self, n_cpus, processes):
         self._cpus = [CPU(idx + 1) for idx in range(n_cpus)]
 
         self._blocked_processes = processes
         self._ready_processes = []
 
+        # attributes of all processes as numpy columns, so the strategies can compute the sort keys of many processes
+        # at once, "rows" maps every process to its row in the columns
+        self._rows = {process: idx for idx, process in enumerate(processes)}
+        self._columns = {attribute: np.fromiter((getattr(process, attribute) for process in processes), dtype=np.int64,
+                                                count=len(processes))
+                         for attribute in ('ready_time', 'exec_time', 'deadline', 'program_counter')}
+
         self._time = 0
         self._logger = ''
 
+        # run-length-encoded history of all cpu allocations
+        self._timeline = Timeline([cpu.id for cpu in self._cpus])
+
+        # callbacks that are called with every scheduler event
+        self._listeners = []
+
         # elapsed times between the timestamp the process got ready and the timestamp it finished
         self._delta_times = []
 
@@ -21,10 +78,27 @@ class Scheduler(ABC):
     def last_allocation(self):
         return [(self._time - 1, cpu.id, cpu.current_process.id) for cpu in self._cpus if cpu.has_process]
 
+    @property
+    def timeline(self):
+        return self._timeline
+
     @property
     def logger(self):
         return self._logger
 
+    # creates a scheduler of this strategy, strategies with different constructor arguments override this
+    @classmethod
+    def create(cls, n_cpus, processes, quantum=None):
+        return cls(n_cpus, processes)
+
+    # registers a callback that is called with every scheduler event as tuple of (timestamp, event, cpu.id, process.id)
+    # event is one of EVENT_ARRIVE, EVENT_ALLOCATE, EVENT_PREEMPT and EVENT_FINISH (cpu.id is None for EVENT_ARRIVE)
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        self._listeners.remove(callback)
+
     @property
     def avg_delta_time(self):
         return '{:4.2f}'.format(sum(self._delta_times) / len(self._delta_times))
@@ -38,18 +112,23 @@ class Scheduler(ABC):
     def step(self):
         # one clock-cycle consists of the following 3 steps
         # 1. move processes, that got ready at the current time, from the blocked-list to the ready-list
-        self._ready_processes.extend([process for process in self._blocked_processes
-                                      if process.ready_time <= self._time])
+        arrived_processes = [process for process in self._blocked_processes if process.ready_time <= self._time]
+        self._ready_processes.extend(arrived_processes)
         self._blocked_processes = [blocked_process for blocked_process in self._blocked_processes
                                    if blocked_process not in self._ready_processes]
+        for process in arrived_processes:
+            self._emit(EVENT_ARRIVE, None, process.id)
 
         # 2. update process-allocation
         self._update_process_allocation()
+        for cpu in self._cpus:
+            self._timeline.record(cpu.id, cpu.current_process.id if cpu.has_process else None, self._time)
 
         # 3. execute all allocated processes on their corresponding cpus
         for cpu in self._cpus:
             if cpu.has_process:
                 cpu.execute_process()
+                self._columns['program_counter'][self._rows[cpu.current_process]] += 1
 
         # if there are no more ready, blocked or allocated processes we are finished
         if len(self._ready_processes) + len(self._blocked_processes) + len(
@@ -64,18 +143,25 @@ class Scheduler(ABC):
     def _log(self, text):
         self._logger += ' [TIME = ' + '{:2.0f}'.format(self._time) + '] ' + text + '\n'
 
+    def _emit(self, event, cid, pid):
+        for callback in self._listeners:
+            callback((self._time, event, cid, pid))
+
     def _allocate_process(self, cpu, process):
         self._ready_processes.remove(process)
         cpu.allocate_process(process)
         self._log(f'Allocated process {process.id} to CPU #{cpu.id}')
+        self._emit(EVENT_ALLOCATE, cpu.id, process.id)
 
     def _deallocate_process(self, cpu):
         self._log(f'Deallocated process {cpu.current_process.id} from CPU #{cpu.id}')
+        self._emit(EVENT_PREEMPT, cpu.id, cpu.current_process.id)
         self._ready_processes.append(cpu.current_process)
         cpu.deallocate_process()
 
     def _deallocate_finished_process(self, cpu):
         self._log(f'Finished process {cpu.current_process.id}')
+        self._emit(EVENT_FINISH, cpu.id, cpu.current_process.id)
         self._delta_times.append(self._time - cpu.current_process.ready_time)
         cpu.deallocate_process()
 
@@ -85,13 +171,24 @@ class Scheduler(ABC):
     def _update_process_allocation(self):
         pass
 
-    # sorts the processes based on the scheduler-strategy
+    # returns the sort keys based on the scheduler-strategy as numpy array, or None if the order of the processes does
+    # not matter
+    # "columns" holds the attributes of all processes as numpy arrays and "rows" the rows of the processes to sort, so
+    # the keys of all processes are computed by vectorized numpy operations instead of one python call per process
     # will be implemented by the schedulers
     @staticmethod
     @abstractmethod
-    def _sort_processes(process):
+    def _sort_keys(columns, rows):
         pass
 
+    # returns the processes stably sorted by the keys of the scheduler-strategy
+    def _sorted(self, processes):
+        rows = np.fromiter(map(self._rows.__getitem__, processes), dtype=np.intp, count=len(processes))
+        keys = self._sort_keys(self._columns, rows)
+        if keys is None:
+            return processes
+        return [processes[idx] for idx in np.argsort(keys, kind='stable').tolist()]
+
 
 # base class for all nonpreemptive schedulers
 class NonPreemptiveScheduler(Scheduler, ABC):
@@ -99,7 +196,7 @@ class NonPreemptiveScheduler(Scheduler, ABC):
         super().__init__(n_cpus, processes)
 
     def _update_process_allocation(self):
-        self._ready_processes.sort(key=self._sort_processes)
+        self._ready_processes = self._sorted(self._ready_processes)
 
         for cpu in self._cpus:
             if cpu.has_finished_process:
@@ -121,8 +218,7 @@ class PreemptiveScheduler(Scheduler, ABC):
                                cpu.has_process and not cpu.has_finished_process]
 
         # get processes that need to be allocated in the next cycle base on the scheduling strategy
-        all_processes = allocated_processes + self._ready_processes
-        all_processes.sort(key=self._sort_processes)
+        all_processes = self._sorted(allocated_processes + self._ready_processes)
         next_processes = all_processes[:min(len(self._cpus), len(all_processes))]
 
         # next processes that are not allocated yet
@@ -144,96 +240,112 @@ class PreemptiveScheduler(Scheduler, ABC):
 
 
 # class for nonpreemptive "first come first serve"-schedulers
+@register_strategy(NP_FCFS)
 class NpFcfsScheduler(NonPreemptiveScheduler):
     def __init__(self, n_cpus, processes):
         super().__init__(n_cpus, processes)
 
     @staticmethod
-    def _sort_processes(process):
+    def _sort_keys(columns, rows):
         # no sorting needed
-        return 0
+        return None
 
 
 # class for nonpreemptive "shortest job first"-schedulers
+@register_strategy(NP_SJF)
 class NpSjfScheduler(NonPreemptiveScheduler):
     def __init__(self, n_cpus, processes):
         super().__init__(n_cpus, processes)
 
     @staticmethod
-    def _sort_processes(process):
+    def _sort_keys(columns, rows):
         # sort by execution time
         # since this is nonpreemptive we do not need to consider the program counter
         # (for processes in the ready list it is always 0)
-        return process.exec_time
+        return columns['exec_time'][rows]
 
 
 # class for nonpreemptive "earliest deadline first"-schedulers
+@register_strategy(NP_EDF)
 class NpEdfScheduler(NonPreemptiveScheduler):
     def __init__(self, n_cpus, processes):
         super().__init__(n_cpus, processes)
 
     @staticmethod
-    def _sort_processes(process):
+    def _sort_keys(columns, rows):
         # sort by deadline
-        return process.deadline
+        return columns['deadline'][rows]
 
 
 # class for nonpreemptive "least laxity first"-schedulers
+@register_strategy(NP_LLF)
 class NpLlfScheduler(NonPreemptiveScheduler):
     def __init__(self, n_cpus, processes):
         super().__init__(n_cpus, processes)
 
     @staticmethod
-    def _sort_processes(process):
+    def _sort_keys(columns, rows):
         # sort by laxity
         # we do not need to consider the current timestamp here because it would be the same for every process
         # since this is nonpreemptive we do not need to consider the program counter either
         # (for processes in the ready list it is always 0)
-        return process.deadline - process.exec_time
+        return columns['deadline'][rows] - columns['exec_time'][rows]
 
 
 # class for preemptive "shortest job first"-schedulers
+@register_strategy(P_SJF)
 class PSjfScheduler(PreemptiveScheduler):
     def __init__(self, n_cpus, processes):
         super().__init__(n_cpus, processes)
 
     @staticmethod
-    def _sort_processes(process):
+    def _sort_keys(columns, rows):
         # sort by remaining execution time
-        return process.exec_time - process.program_counter
+        return columns['exec_time'][rows] - columns['program_counter'][rows]
 
 
 # class for preemptive "earliest deadline first"-schedulers
+@register_strategy(P_EDF)
 class PEdfScheduler(PreemptiveScheduler):
     def __init__(self, n_cpus, processes):
         super().__init__(n_cpus, processes)
 
     @staticmethod
-    def _sort_processes(process):
+    def _sort_keys(columns, rows):
         # sort by deadline
-        return process.deadline
+        return columns['deadline'][rows]
 
 
 # class for preemptive "least laxity first"-schedulers
+@register_strategy(P_LLF)
 class PLlfScheduler(PreemptiveScheduler):
     def __init__(self, n_cpus, processes):
         super().__init__(n_cpus, processes)
 
     @staticmethod
-    def _sort_processes(process):
+    def _sort_keys(columns, rows):
         # sort by laxity
         # we do not need to consider the current timestamp here because it would be the same for every process
-        return process.deadline - process.exec_time + process.program_counter
+        return columns['deadline'][rows] - columns['exec_time'][rows] + columns['program_counter'][rows]
 
 
 # class for preemptive "round robin"-schedulers
 # this scheduler has only one cpu to work with
+@register_strategy(P_RR)
 class PRrScheduler(PreemptiveScheduler):
+    uses_quantum = True
+
     def __init__(self, processes, quantum):
         super().__init__(1, processes)
         self._quantum = quantum
         self._quantum_counter = 0
 
+    @classmethod
+    def create(cls, n_cpus, processes, quantum=None):
+        if quantum is None:
+            raise ValueError(f'{cls.name} needs a quantum')
+        return cls(processes, quantum)
+
     # since the "round robin"-scheduler is mainly different from the other preemptive schedulers, we override this
     # function and implement the "round robin"-schedulers own logic here
     def _update_process_allocation(self):
@@ -256,7 +368,7 @@ class PRrScheduler(PreemptiveScheduler):
         self._quantum_counter += 1
 
     @staticmethod
-    def _sort_processes(process):
+    def _sort_keys(columns, rows):
         # since we override _update_process_allocation() and we do not use this function there, there is no need to
         # properly implement this function
-        pass
+        return None
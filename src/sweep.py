@@ -0,0 +1,277 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+import uuid
+from process import Process
+from scheduler import create_scheduler
+
+
+# sweep-specific constants
+SHARD_SIZE = 16
+STALE_TIMEOUT = 60
+POLL_INTERVAL = 1
+
+# a sweep splits a list of jobs into shards which are stored as files in a work-queue directory
+# every shard file moves through the subdirectories "pending" -> "claimed" -> "done" by renaming it, which is atomic
+# (also on filesystems shared by several nodes), so any number of workers can claim shards without further locking
+# a claimed shard gets a unique owner token appended to its name, so a worker notices when its shard got released and
+# claimed again by another worker
+# the results of each claim are appended to their own file in "results" after every job, so a crashed worker only
+# loses the job it was working on and two workers never write to the same file
+PENDING_DIR = 'pending'
+CLAIMED_DIR = 'claimed'
+DONE_DIR = 'done'
+RESULTS_DIR = 'results'
+MANIFEST_FILE = 'manifest.json'
+
+
+# runs a single job given as tuple of (scheduler_name, n_cpus, quantum, process_configs) and returns the average
+# delta time, scheduler_name is the name of a registered strategy
+def run_job(job):
+    scheduler_name, n_cpus, quantum, process_configs = job
+    processes = [Process(idx + 1, ready_time, exec_time, deadline)
+                 for idx, (ready_time, exec_time, deadline) in enumerate(process_configs)]
+
+    scheduler = create_scheduler(scheduler_name, n_cpus, processes, quantum)
+    scheduler.run_until_finished()
+    return scheduler.avg_delta_time
+
+
+# creates the work-queue directory for the given jobs
+# returns False if the sweep already exists (e.g. it was created by another worker or an interrupted run) and raises a
+# ValueError if the existing sweep was created for different jobs
+def create_sweep(queue_dir, jobs, shard_size=SHARD_SIZE):
+    jobs = [list(job) for job in jobs]
+    jobs_hash = _hash_jobs(jobs)
+
+    if not os.path.exists(queue_dir):
+        # the sweep is built in a temporary directory which is renamed into place when it is complete, so a crash
+        # during the creation never leaves an incomplete sweep behind
+        tmp_dir = f'{os.path.normpath(queue_dir)}.{uuid.uuid4().hex}.tmp'
+        os.makedirs(tmp_dir)
+        for sub_dir in (PENDING_DIR, CLAIMED_DIR, DONE_DIR, RESULTS_DIR):
+            os.mkdir(os.path.join(tmp_dir, sub_dir))
+
+        n_shards = 0
+        for n_shards, idx in enumerate(range(0, len(jobs), shard_size), 1):
+            _write_atomic(os.path.join(tmp_dir, PENDING_DIR, _shard_name(n_shards - 1)),
+                          {'jobs': jobs[idx:idx + shard_size]})
+        _write_atomic(os.path.join(tmp_dir, MANIFEST_FILE),
+                      {'n_shards': n_shards, 'n_jobs': len(jobs), 'jobs_hash': jobs_hash})
+
+        # renaming fails if another worker was faster
+        try:
+            os.rename(tmp_dir, queue_dir)
+            return True
+        except OSError:
+            shutil.rmtree(tmp_dir)
+            if not os.path.exists(queue_dir):
+                raise
+
+    with open(os.path.join(queue_dir, MANIFEST_FILE)) as file:
+        if json.load(file)['jobs_hash'] != jobs_hash:
+            raise ValueError(f'work queue {queue_dir} was created for different jobs')
+    return False
+
+
+# claims and processes shards until all shards of the sweep are done
+# shards of workers that did not report progress for "stale_timeout" seconds are claimed again
+def run_worker(queue_dir, stale_timeout=STALE_TIMEOUT):
+    while True:
+        claim = _claim_shard(queue_dir)
+        if claim is None:
+            if not os.listdir(os.path.join(queue_dir, CLAIMED_DIR)):
+                return
+            _release_stale_shards(queue_dir, stale_timeout)
+            time.sleep(POLL_INTERVAL)
+            continue
+
+        _process_shard(queue_dir, *claim, stale_timeout)
+
+
+# runs "n_workers" local worker processes until the sweep is done
+# raises a RuntimeError if any of the worker processes failed
+def run_workers(queue_dir, n_workers, stale_timeout=STALE_TIMEOUT):
+    if n_workers <= 1:
+        run_worker(queue_dir, stale_timeout)
+        return
+
+    workers = [multiprocessing.Process(target=run_worker, args=(queue_dir, stale_timeout)) for _ in range(n_workers)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    exitcodes = [worker.exitcode for worker in workers if worker.exitcode != 0]
+    if exitcodes:
+        raise RuntimeError(f'{len(exitcodes)} of {n_workers} workers of {queue_dir} failed with exit codes {exitcodes}')
+
+
+# merges the per-shard result files and returns a list of (job, result) tuples in the order the jobs were created
+# raises a RuntimeError if the sweep is incomplete
+def merge_results(queue_dir):
+    with open(os.path.join(queue_dir, MANIFEST_FILE)) as file:
+        n_shards = json.load(file)['n_shards']
+
+    merged = []
+    incomplete_shards = []
+    for idx in range(n_shards):
+        shard_name = _shard_name(idx)
+        jobs = _load_shard(queue_dir, shard_name)['jobs']
+        results = _load_results(queue_dir, shard_name)
+        if len(results) < len(jobs):
+            incomplete_shards.append(shard_name)
+            continue
+        merged.extend([(job, results[job_idx]) for job_idx, job in enumerate(jobs)])
+
+    if incomplete_shards:
+        raise RuntimeError(f'sweep {queue_dir} is incomplete, shards without all results: {incomplete_shards}')
+    return merged
+
+
+# creates the sweep if necessary, works on it with "n_workers" local workers and returns the merged results
+# the same call can be made on several nodes that share the work-queue directory
+def run_sweep(queue_dir, jobs, n_workers=1, shard_size=SHARD_SIZE, stale_timeout=STALE_TIMEOUT):
+    create_sweep(queue_dir, jobs, shard_size)
+    run_workers(queue_dir, n_workers, stale_timeout)
+    return merge_results(queue_dir)
+
+
+def _shard_name(idx):
+    return f'{idx:06d}.json'
+
+
+def _hash_jobs(jobs):
+    return hashlib.sha256(json.dumps(jobs).encode()).hexdigest()
+
+
+def _write_atomic(path, data):
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as file:
+        json.dump(data, file)
+    os.replace(tmp_path, path)
+
+
+# returns the names of all files in "directory" that belong to the given shard (claimed shards and results are named
+# "<shard_name>.<owner token>")
+def _shard_files(directory, shard_name):
+    return [file_name for file_name in os.listdir(directory) if file_name.startswith(f'{shard_name}.')]
+
+
+def _load_shard(queue_dir, shard_name):
+    paths = [os.path.join(queue_dir, DONE_DIR, shard_name), os.path.join(queue_dir, PENDING_DIR, shard_name)]
+    paths.extend([os.path.join(queue_dir, CLAIMED_DIR, file_name)
+                  for file_name in _shard_files(os.path.join(queue_dir, CLAIMED_DIR), shard_name)])
+    for path in paths:
+        try:
+            with open(path) as file:
+                return json.load(file)
+        except FileNotFoundError:
+            pass
+    raise FileNotFoundError(f'shard {shard_name} not found in {queue_dir}')
+
+
+# returns the checkpointed results of all claims of a shard as dict of job index -> result
+def _load_results(queue_dir, shard_name):
+    results = {}
+    for file_name in _shard_files(os.path.join(queue_dir, RESULTS_DIR), shard_name):
+        with open(os.path.join(queue_dir, RESULTS_DIR, file_name)) as file:
+            for line in file:
+                # a worker that crashed while writing may have left an incomplete last line
+                if line.endswith('\n'):
+                    job_idx, result = json.loads(line)
+                    results[job_idx] = result
+    return results
+
+
+# moves the first pending shard to the claimed shards and returns it as tuple of (shard_name, owner token)
+# returns None if no shard is pending
+def _claim_shard(queue_dir):
+    for shard_name in sorted(os.listdir(os.path.join(queue_dir, PENDING_DIR))):
+        pending_path = os.path.join(queue_dir, PENDING_DIR, shard_name)
+        token = uuid.uuid4().hex
+        try:
+            # renaming keeps the modification time, so the shard is touched first to not be released as stale
+            os.utime(pending_path)
+            os.rename(pending_path, os.path.join(queue_dir, CLAIMED_DIR, f'{shard_name}.{token}'))
+        except FileNotFoundError:
+            # another worker was faster
+            continue
+        return shard_name, token
+    return None
+
+
+# moves claimed shards without progress for "stale_timeout" seconds back to the pending shards
+def _release_stale_shards(queue_dir, stale_timeout):
+    for file_name in os.listdir(os.path.join(queue_dir, CLAIMED_DIR)):
+        claimed_path = os.path.join(queue_dir, CLAIMED_DIR, file_name)
+        shard_name = file_name.rsplit('.', 1)[0]
+        try:
+            if time.time() - os.path.getmtime(claimed_path) > stale_timeout:
+                os.rename(claimed_path, os.path.join(queue_dir, PENDING_DIR, shard_name))
+        except FileNotFoundError:
+            pass
+
+
+# touches the claimed shard every "interval" seconds until "stop" is set
+# sets "lost" and returns if the shard got released in the meantime
+def _heartbeat(claimed_path, interval, stop, lost):
+    while not stop.wait(interval):
+        try:
+            os.utime(claimed_path)
+        except FileNotFoundError:
+            lost.set()
+            return
+
+
+def _process_shard(queue_dir, shard_name, token, stale_timeout):
+    claimed_path = os.path.join(queue_dir, CLAIMED_DIR, f'{shard_name}.{token}')
+    results_path = os.path.join(queue_dir, RESULTS_DIR, f'{shard_name}.{token}')
+
+    try:
+        with open(claimed_path) as file:
+            jobs = json.load(file)['jobs']
+    except FileNotFoundError:
+        # the shard got released before the worker started
+        return
+
+    # resume after the jobs that were checkpointed by previous claims of this shard
+    done_jobs = _load_results(queue_dir, shard_name)
+
+    # the heartbeat also runs while a job is executed, so long jobs do not get their shard released
+    stop, lost = threading.Event(), threading.Event()
+    heartbeat = threading.Thread(target=_heartbeat, args=(claimed_path, stale_timeout / 3, stop, lost), daemon=True)
+    heartbeat.start()
+    try:
+        with open(results_path, 'a') as file:
+            for job_idx, job in enumerate(jobs):
+                if job_idx in done_jobs:
+                    continue
+
+                result = run_job(job)
+
+                # if the shard got released in the meantime it may already be processed by another worker
+                if lost.is_set() or not os.path.exists(claimed_path):
+                    return
+
+                file.write(json.dumps([job_idx, result]) + '\n')
+                file.flush()
+                os.fsync(file.fileno())
+    finally:
+        stop.set()
+        heartbeat.join()
+
+    try:
+        os.rename(claimed_path, os.path.join(queue_dir, DONE_DIR, shard_name))
+    except FileNotFoundError:
+        pass
+    except FileExistsError:
+        # the shard was already finished by another worker (renaming does not replace files on windows)
+        try:
+            os.remove(claimed_path)
+        except FileNotFoundError:
+            pass
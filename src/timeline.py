@@ -0,0 +1,156 @@
+from bisect import bisect_left, bisect_right
+
+
+# run-length-encoded history of the cpu allocation
+# instead of storing one entry per clock-cycle and cpu, an interval is only written when the allocation of a cpu
+# changes, so the memory usage scales with the number of context switches and not with the simulation length
+# intervals are represented as tuple of (cpu.id, process.id, start, end) with "end" being exclusive
+class Timeline:
+    def __init__(self, cpu_ids):
+        # closed intervals per cpu, stored as parallel lists that are sorted by their start time
+        # "busy" holds the accumulated duration of all intervals up to (including) the interval at the same index,
+        # which allows computing the utilization of arbitrary time ranges by two lookups
+        self._starts = {cid: [] for cid in cpu_ids}
+        self._ends = {cid: [] for cid in cpu_ids}
+        self._pids = {cid: [] for cid in cpu_ids}
+        self._busy = {cid: [] for cid in cpu_ids}
+
+        # closed intervals per process
+        self._pid_intervals = {}
+
+        # closed intervals per cpu and process as tuple of the lists (starts, ends, busy), like the lists above
+        # allows computing the busy time of a single process on a cpu by two lookups
+        self._cpu_pid_intervals = {cid: {} for cid in cpu_ids}
+
+        # currently running (not yet closed) interval per cpu as tuple of (process.id, start)
+        self._open = {}
+
+        # first timestamp that has not been recorded yet
+        self._end_time = 0
+
+    @property
+    def cpu_ids(self):
+        return list(self._starts)
+
+    @property
+    def end_time(self):
+        return self._end_time
+
+    # records that the process with id "pid" runs on the cpu with id "cid" during the clock-cycle "time"
+    # pid is None if the cpu is idle; nothing is written as long as the allocation stays the same
+    def record(self, cid, pid, time):
+        current = self._open.get(cid)
+        if current is not None and current[0] != pid:
+            self._close(cid, time)
+            current = None
+
+        if current is None and pid is not None:
+            self._open[cid] = (pid, time)
+
+        self._end_time = max(self._end_time, time + 1)
+
+    # returns the interval that was running on the cpu with id "cid" at timestamp "time" (None if it was idle)
+    def interval_at(self, cid, time):
+        if not 0 <= time < self._end_time:
+            return None
+
+        current = self._open.get(cid)
+        if current is not None and current[1] <= time:
+            return cid, current[0], current[1], self._end_time
+
+        idx = bisect_right(self._starts[cid], time) - 1
+        if idx >= 0 and time < self._ends[cid][idx]:
+            return cid, self._pids[cid][idx], self._starts[cid][idx], self._ends[cid][idx]
+        return None
+
+    # returns all intervals of the process with id "pid" sorted by their start time
+    def intervals_of(self, pid):
+        intervals = [(cid, pid, start, end) for cid, start, end in self._pid_intervals.get(pid, [])]
+        intervals.extend([(cid, pid, start, self._end_time) for cid, (open_pid, start) in self._open.items()
+                          if open_pid == pid])
+        return intervals
+
+    # returns the ids of all processes that ran on the cpu with id "cid"
+    def pids_on(self, cid):
+        pids = set(self._cpu_pid_intervals[cid])
+        if cid in self._open:
+            pids.add(self._open[cid][0])
+        return pids
+
+    # returns the intervals of the cpu with id "cid" that overlap [t0, t1) sorted by their start time
+    def intervals_between(self, cid, t0, t1):
+        first, last = self._overlapping(cid, t0, t1)
+        intervals = list(zip([cid] * (last - first), self._pids[cid][first:last], self._starts[cid][first:last],
+                             self._ends[cid][first:last]))
+        if cid in self._open and self._open[cid][1] < t1 and t0 < self._end_time:
+            intervals.append((cid, self._open[cid][0], self._open[cid][1], self._end_time))
+        return intervals
+
+    # returns the number of intervals of the cpu with id "cid" that overlap [t0, t1) without creating them
+    def count_between(self, cid, t0, t1):
+        first, last = self._overlapping(cid, t0, t1)
+        count = max(0, last - first)
+        if cid in self._open and self._open[cid][1] < t1 and t0 < self._end_time:
+            count += 1
+        return count
+
+    # returns all intervals of all cpus sorted by cpu and start time
+    def intervals(self):
+        intervals = []
+        for cid in self._starts:
+            intervals.extend(zip([cid] * len(self._starts[cid]), self._pids[cid], self._starts[cid], self._ends[cid]))
+            if cid in self._open:
+                intervals.append((cid, self._open[cid][0], self._open[cid][1], self._end_time))
+        return intervals
+
+    # returns the share of cpu time that was used by processes in [t0, t1), averaged over all cpus
+    def utilization(self, t0, t1):
+        if t1 <= t0 or not self._starts:
+            return 0.0
+        return sum(self.busy_time(cid, t0, t1) for cid in self._starts) / (len(self._starts) * (t1 - t0))
+
+    # returns the number of clock-cycles the cpu with id "cid" was busy in [t0, t1)
+    # if "pid" is given, only the clock-cycles of the process with this id are counted
+    def busy_time(self, cid, t0, t1, pid=None):
+        if t1 <= t0:
+            return 0
+
+        if pid is None:
+            starts, ends, busy = self._starts[cid], self._ends[cid], self._busy[cid]
+        else:
+            starts, ends, busy = self._cpu_pid_intervals[cid].get(pid, ([], [], []))
+
+        # closed intervals overlapping [t0, t1) are those in [first, last)
+        first, last = bisect_right(ends, t0), bisect_left(starts, t1)
+
+        busy_time = 0
+        if first < last:
+            busy_time = busy[last - 1] - (busy[first - 1] if first > 0 else 0)
+            # clip the partially overlapping intervals at the borders
+            busy_time -= max(0, t0 - starts[first]) + max(0, ends[last - 1] - t1)
+
+        if cid in self._open and pid in (None, self._open[cid][0]):
+            start = self._open[cid][1]
+            busy_time += max(0, min(t1, self._end_time) - max(t0, start))
+
+        return busy_time
+
+    # closed intervals of the cpu with id "cid" overlapping [t0, t1) are those with an index in [first, last)
+    def _overlapping(self, cid, t0, t1):
+        return bisect_right(self._ends[cid], t0), bisect_left(self._starts[cid], t1)
+
+    def _close(self, cid, time):
+        pid, start = self._open.pop(cid)
+        previous_busy = self._busy[cid][-1] if self._busy[cid] else 0
+
+        self._starts[cid].append(start)
+        self._ends[cid].append(time)
+        self._pids[cid].append(pid)
+        self._busy[cid].append(previous_busy + time - start)
+
+        self._pid_intervals.setdefault(pid, []).append((cid, start, time))
+
+        starts, ends, busy = self._cpu_pid_intervals[cid].setdefault(pid, ([], [], []))
+        starts.append(start)
+        ends.append(time)
+        busy.append((busy[-1] if busy else 0) + time - start)